@@ -0,0 +1,94 @@
+import json
+import os
+import sqlite3
+import time
+from collections import OrderedDict
+
+from constants import CACHE_FOLDER
+
+
+class DiskCache:
+    """A persistent dictionary in an SQLite file, call save() to commit changes
+
+    Values are stored as JSON. If ttl is given, entries older than ttl seconds
+    are treated as missing, and are fetched and stored again by the caller.
+    """
+
+    def __init__(self, name: str, folder: str = CACHE_FOLDER, ttl: float = None):
+        os.makedirs(folder, exist_ok=True)
+        self.filename = os.path.join(folder, name + ".sqlite")
+        self.ttl = ttl
+        self._db = sqlite3.connect(self.filename)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, saved_at REAL NOT NULL)"
+        )
+
+    def _load(self, key):
+        row = self._db.execute(
+            "SELECT value, saved_at FROM cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None or (self.ttl is not None and time.time() - row[1] > self.ttl):
+            return None
+        return row
+
+    def __contains__(self, key):
+        return self._load(key) is not None
+
+    def __getitem__(self, key):
+        row = self._load(key)
+        if row is None:
+            raise KeyError(key)
+        return json.loads(row[0])
+
+    def __setitem__(self, key, value):
+        self._db.execute(
+            "INSERT OR REPLACE INTO cache VALUES (?, ?, ?)",
+            (key, json.dumps(value), time.time()),
+        )
+
+    def get(self, key, default=None):
+        row = self._load(key)
+        return default if row is None else json.loads(row[0])
+
+    def save(self):
+        self._db.commit()
+
+
+class LRUCache:
+    """Keeps the most recently used entries of a DiskCache in memory"""
+
+    def __init__(self, disk: DiskCache, maxsize: int = 10000):
+        self.disk = disk
+        self.maxsize = maxsize
+        self._memory = OrderedDict()
+
+    def _remember(self, key, value):
+        self._memory[key] = value
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.maxsize:
+            self._memory.popitem(last=False)
+
+    def __contains__(self, key):
+        return key in self._memory or key in self.disk
+
+    def __getitem__(self, key):
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return self._memory[key]
+        value = self.disk[key]
+        self._remember(key, value)
+        return value
+
+    def __setitem__(self, key, value):
+        self.disk[key] = value
+        self._remember(key, value)
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def save(self):
+        self.disk.save()
@@ -3,3 +3,8 @@ CLIENT_ID = "98fb478a3f50466c8fcad83106f79c3e"
 ALBUM_TYPE_SINGLE = "single"
 ALBUM_TYPE_ALBUM = "album"
 ALBUM_TYPE_COMPILATIONS = "compilation"
+CACHE_FOLDER = "cache"
+TEMPO_BAND = 20
+ENERGY_BAND = 20
+JOURNAL_FOLDER = ".journal"
+CREATED_DESCRIPTION = "Created by SpotifyDataTools"
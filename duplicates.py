@@ -0,0 +1,204 @@
+import re
+import unicodedata
+import zlib
+
+import numpy as np
+
+# Bracketed or dashed title suffixes containing any of these whole words are
+# version markers ("- Remastered 2011", "(feat. X)", "[Live]") and are dropped,
+# unless they are a remix, which is a different recording.
+VERSION_WORDS = (
+    r"remaster(?:ed)?",
+    r"live",
+    r"version",
+    r"edit",
+    r"mono",
+    r"stereo",
+    r"deluxe",
+    r"anniversary",
+    r"bonus",
+    r"re-record(?:ed|ing)?",
+    r"explicit",
+    r"feat",
+    r"ft",
+    r"with",
+)
+# "Song - With You" is more likely part of the title than a featured artist
+_DASHED_WORDS = [w for w in VERSION_WORDS if w != "with"]
+_BRACKETED_RE = re.compile(
+    rf"[\(\[](?![^\)\]]*mix\b)[^\)\]]*\b(?:{'|'.join(VERSION_WORDS)})\b[^\)\]]*[\)\]]",
+    re.IGNORECASE,
+)
+_DASHED_RE = re.compile(
+    rf"\s-\s(?!.*mix\b).*\b(?:{'|'.join(_DASHED_WORDS)})\b.*$", re.IGNORECASE
+)
+_PUNCTUATION_RE = re.compile(r"[^\w\s]")
+# Roman numerals up to 39, larger ones clash with words like "mix" (1009)
+_ROMAN_RE = re.compile(r"^x{0,3}(?:ix|iv|v?i{0,3})$")
+_ROMAN_VALUES = {"i": 1, "v": 5, "x": 10}
+
+SHINGLE_SIZE = 3
+# 16 bands of 4 rows puts the LSH threshold at a jaccard of about (1/16)^(1/4) = 0.5,
+# candidates are then verified exactly against TITLE_THRESHOLD.
+LSH_BANDS = 16
+LSH_ROWS = 4
+TITLE_THRESHOLD = 0.8
+_HASH_PRIME = (1 << 61) - 1
+_HASH_SEED = 0x5D0
+
+
+def normalize_title(name: str) -> str:
+    """Strip version suffixes, accents and punctuation from a track name"""
+    stripped = _BRACKETED_RE.sub(" ", name)
+    stripped = _DASHED_RE.sub(" ", stripped)
+    stripped = unicodedata.normalize("NFKD", stripped)
+    stripped = "".join(c for c in stripped if not unicodedata.combining(c))
+    stripped = " ".join(_PUNCTUATION_RE.sub(" ", stripped.lower()).split())
+    # Titles like "(Live)" or "?" have nothing left, so keep them as they are
+    return stripped or " ".join(name.lower().split())
+
+
+def normalize_artists(artists: list) -> tuple:
+    return tuple(sorted({" ".join(a["name"].lower().split()) for a in artists}))
+
+
+def roman_to_int(token: str) -> int:
+    values = [_ROMAN_VALUES[c] for c in token]
+    return sum(
+        -v if i + 1 < len(values) and v < values[i + 1] else v
+        for i, v in enumerate(values)
+    )
+
+
+def numbers(title: str) -> list:
+    """The numbers in a normalized title, so "Pt. 2" and "Part II" both give [2]"""
+    return [
+        int(token) if token.isdigit() else roman_to_int(token)
+        for token in title.split()
+        if token.isdigit() or _ROMAN_RE.match(token)
+    ]
+
+
+def shingles(text: str) -> set:
+    text = f" {text} "
+    return {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+
+
+def jaccard(a: set, b: set) -> float:
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def find_duplicates(tracks: list) -> list:
+    """Group near-duplicate tracks, returning lists of indices into tracks
+
+    Tracks are grouped when they share an ISRC, or when their normalized titles
+    are similar and they share an artist. Similar titles are found with MinHash
+    LSH, bucketed per artist, so candidate pairs are generated without comparing
+    every pair.
+    """
+    parent = list(range(len(tracks)))
+
+    def find(i):
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    def union(i, j):
+        i, j = find(i), find(j)
+        if i != j:
+            parent[max(i, j)] = min(i, j)
+
+    # Exact matches: same ISRC, or the same normalized title and artists
+    isrcs = {}
+    keys = {}
+    for i, t in enumerate(tracks):
+        if t["track"] is None:
+            continue
+        isrc = t["track"].get("external_ids", {}).get("isrc")
+        if isrc:
+            union(i, isrcs.setdefault(isrc.upper(), i))
+        key = (
+            normalize_title(t["track"]["name"]),
+            normalize_artists(t["track"]["artists"]),
+        )
+        union(i, keys.setdefault(key, i))
+
+    # Near matches: only distinct keys need hashing, with the first track as representative.
+    # Empty titles have no shingles, so can only match exactly. Titles differing in a
+    # number, like "Pt. 1" and "Pt. 2", are separate tracks however similar.
+    key_list = [key for key in keys if key[0]]
+    title_shingles = [shingles(title) for title, _ in key_list]
+    title_numbers = [numbers(title) for title, _ in key_list]
+    for a, b in lsh_candidates(title_shingles, [artists for _, artists in key_list]):
+        if (
+            title_numbers[a] == title_numbers[b]
+            and jaccard(title_shingles[a], title_shingles[b]) >= TITLE_THRESHOLD
+        ):
+            union(keys[key_list[a]], keys[key_list[b]])
+
+    groups = {}
+    for i, t in enumerate(tracks):
+        if t["track"] is not None:
+            groups.setdefault(find(i), []).append(i)
+    return [g for g in groups.values() if len(g) > 1]
+
+
+def minhash_signatures(shingle_sets: list) -> np.ndarray:
+    """Compute a MinHash signature per non-empty shingle set, one row each"""
+    hashes = np.array(
+        [zlib.crc32(s.encode("utf-8")) for ss in shingle_sets for s in ss],
+        dtype=np.uint64,
+    )
+    offsets = np.cumsum([0] + [len(ss) for ss in shingle_sets[:-1]])
+
+    rng = np.random.default_rng(_HASH_SEED)
+    num_perm = LSH_BANDS * LSH_ROWS
+    a = rng.integers(1, 1 << 32, num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, num_perm, dtype=np.uint64)
+
+    signatures = np.empty((len(shingle_sets), num_perm), dtype=np.uint64)
+    for p in range(num_perm):
+        signatures[:, p] = np.minimum.reduceat(
+            (a[p] * hashes + b[p]) % _HASH_PRIME, offsets
+        )
+    return signatures
+
+
+def lsh_candidates(shingle_sets: list, artists: list) -> set:
+    """Return the (i, j) pairs, i < j, sharing an artist and at least one LSH bucket"""
+    if len(shingle_sets) < 2:
+        return set()
+
+    # One (set, artist) row per artist, so buckets only hold tracks sharing an artist
+    artist_ids = {}
+    pairs = np.array(
+        [
+            (i, artist_ids.setdefault(artist, len(artist_ids)))
+            for i, names in enumerate(artists)
+            for artist in names
+        ],
+        dtype=np.int64,
+    ).reshape(-1, 2)
+
+    # Each band of rows, combined with the artist, is folded into a single 64 bit bucket key
+    rng = np.random.default_rng(_HASH_SEED + 1)
+    mix = rng.integers(1, 1 << 63, LSH_ROWS + 1, dtype=np.uint64) | np.uint64(1)
+
+    signatures = minhash_signatures(shingle_sets)[pairs[:, 0]]
+    artist_keys = pairs[:, 1].astype(np.uint64) * mix[LSH_ROWS]
+    candidates = set()
+    for band in range(LSH_BANDS):
+        rows = signatures[:, band * LSH_ROWS : (band + 1) * LSH_ROWS]
+        buckets = (rows * mix[:LSH_ROWS]).sum(axis=1, dtype=np.uint64) ^ artist_keys
+
+        order = np.argsort(buckets, kind="stable")
+        starts = np.flatnonzero(np.diff(buckets[order], prepend=~buckets[order[:1]]))
+        ends = np.append(starts[1:], len(order))
+        shared = ends - starts > 1
+        for start, end in zip(starts[shared].tolist(), ends[shared].tolist()):
+            bucket = pairs[order[start:end], 0].tolist()
+            candidates.update(
+                (a, b) for k, a in enumerate(bucket) for b in bucket[k + 1 :] if a != b
+            )
+    return candidates
@@ -0,0 +1,79 @@
+import logging
+
+from cache import DiskCache, LRUCache
+from spotify_api import SpotifyAPI
+
+# Maximum number of IDs accepted by each batch endpoint
+AUDIO_FEATURES_BATCH = 100
+ARTISTS_BATCH = 50
+ALBUMS_BATCH = 20
+
+# Genres change rarely, but do change, so artists and albums are refetched after 30 days
+METADATA_TTL = 30 * 24 * 60 * 60
+
+
+def fetch_missing(
+    spotify: SpotifyAPI, endpoint: str, ids: set, cache, batch: int, trim=None
+):
+    """Fetch the objects for ids that aren't cached, batch at a time, into the cache"""
+    missing = sorted(i for i in ids if i not in cache)
+    if missing:
+        logging.info(
+            f"Loading {endpoint} for {len(missing)} IDs ({len(ids) - len(missing)} cached)"
+        )
+
+    # Save even if interrupted, so finished batches are never fetched again
+    try:
+        for i in range(0, len(missing), batch):
+            ids_batch = missing[i : i + batch]
+            response = spotify.get(endpoint, {"ids": ",".join(ids_batch)})
+            # Unknown IDs come back as null, cache those too so they aren't refetched
+            for key, obj in zip(ids_batch, response[endpoint.replace("-", "_")]):
+                cache[key] = trim(obj) if trim and obj else obj
+    finally:
+        cache.save()
+
+
+def load_audio_features(spotify: SpotifyAPI, tracks: list, cache=None):
+    """Set t["audio_features"] on each track, fetching only those not yet cached"""
+    if cache is None:
+        cache = DiskCache("audio_features")
+
+    # Local files have no ID and no audio features
+    ids = {t["track"]["id"] for t in tracks if t["track"] and t["track"]["id"]}
+    fetch_missing(spotify, "audio-features", ids, cache, AUDIO_FEATURES_BATCH)
+
+    for t in tracks:
+        if t["track"]:
+            t["audio_features"] = cache.get(t["track"]["id"])
+
+
+def trim(obj):
+    # Only keep what's needed, full albums include their whole tracklist
+    return {"id": obj["id"], "name": obj["name"], "genres": obj.get("genres", [])}
+
+
+def load_genres(spotify: SpotifyAPI, tracks: list, artist_cache=None, album_cache=None):
+    """Set t["genres"] on each track from its album and artists
+
+    Pass the tracks of all loaded playlists at once, so each artist and album
+    is only looked up once.
+    """
+    if artist_cache is None:
+        artist_cache = LRUCache(DiskCache("artists", ttl=METADATA_TTL))
+    if album_cache is None:
+        album_cache = LRUCache(DiskCache("albums", ttl=METADATA_TTL))
+
+    tracks = [t for t in tracks if t["track"]]
+    artist_ids = {a["id"] for t in tracks for a in t["track"]["artists"] if a["id"]}
+    album_ids = {t["track"]["album"]["id"] for t in tracks if t["track"]["album"]["id"]}
+
+    fetch_missing(spotify, "artists", artist_ids, artist_cache, ARTISTS_BATCH, trim)
+    fetch_missing(spotify, "albums", album_ids, album_cache, ALBUMS_BATCH, trim)
+
+    for t in tracks:
+        objs = [album_cache.get(t["track"]["album"]["id"])] + [
+            artist_cache.get(a["id"]) for a in t["track"]["artists"]
+        ]
+        # dict keeps the first occurrence of each genre in order
+        t["genres"] = list(dict.fromkeys(g for o in objs if o for g in o["genres"]))
@@ -3,8 +3,10 @@ import http.client
 import http.server
 import json
 import logging
+import os
 import re
 import sys
+import threading
 import time
 import urllib.error
 import urllib.parse
@@ -14,9 +16,24 @@ import webbrowser
 
 class SpotifyAPI:
 
-    # Requires an OAuth token.
-    def __init__(self, auth):
+    # Requires an OAuth token. Optionally limits the requests made per second, the
+    # budget is per instance and shared by all threads using it.
+    def __init__(self, auth, requests_per_second=None):
         self._auth = auth
+        self._interval = 1 / requests_per_second if requests_per_second else 0
+        self._next_request = 0
+        self._lock = threading.Lock()
+
+    # Waits until the request budget allows another request.
+    def _wait_for_budget(self):
+        if not self._interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_request - now
+            self._next_request = max(now, self._next_request) + self._interval
+        if wait > 0:
+            time.sleep(wait)
 
     # Gets a resource from the Spotify API and returns the object.
     def get(self, url, params={}, tries=3):
@@ -32,6 +49,7 @@ class SpotifyAPI:
 
         # Try the sending off the request a specified number of times before giving up.
         for _ in range(tries):
+            self._wait_for_budget()
             try:
                 req = urllib.request.Request(url)
                 req.add_header("Authorization", "Bearer " + self._auth)
@@ -52,10 +70,17 @@ class SpotifyAPI:
 
     # The Spotify API breaks long lists into multiple pages. This method automatically
     # fetches all pages and joins them, returning in a single list of objects.
-    def list(self, url, params={}):
+    # If a journal filename is given, each page is appended to it as it arrives, and
+    # pages already in the journal are reused, so an interrupted listing can resume.
+    def list(self, url, params={}, journal=None):
         last_log_time = time.time()
-        response = self.get(url, params)
-        items = response["items"]
+        items, response = SpotifyAPI._read_journal(journal)
+        if response is None:
+            response = self.get(url, params)
+            SpotifyAPI._write_journal(journal, response)
+            items = response["items"]
+        else:
+            logging.info(f"Resuming from {len(items)}/{response['total']} items")
 
         while response["next"]:
             if time.time() > last_log_time + 15:
@@ -63,9 +88,49 @@ class SpotifyAPI:
                 logging.info(f"Loaded {len(items)}/{response['total']} items")
 
             response = self.get(response["next"])
+            SpotifyAPI._write_journal(journal, response)
             items += response["items"]
         return items
 
+    # Reads the pages saved in a journal, returning all their items and the last page.
+    @staticmethod
+    def _read_journal(journal):
+        items = []
+        page = None
+        if not journal or not os.path.exists(journal):
+            return items, page
+
+        with open(journal, "rb") as f:
+            end = 0
+            for line in iter(f.readline, b""):
+                try:
+                    page = json.loads(line)
+                except json.JSONDecodeError:
+                    break  # The last page was only partly written
+                items += page["items"]
+                end = f.tell()
+
+        # Drop anything after the last complete page, so new pages follow on from it
+        os.truncate(journal, end)
+        return items, page
+
+    @staticmethod
+    def _write_journal(journal, response):
+        if not journal:
+            return
+
+        os.makedirs(os.path.dirname(journal) or ".", exist_ok=True)
+        with open(journal, "a", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "next": response["next"],
+                    "total": response["total"],
+                    "items": response["items"],
+                },
+                f,
+            )
+            f.write("\n")
+
     # Pops open a browser window for a user to log in and authorize API access.
     @staticmethod
     def authorize(client_id, scope):
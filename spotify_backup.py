@@ -1,19 +1,32 @@
 #!/usr/bin/env python3
 
 import argparse
+import glob
 import json
 import logging
 import os
+import sys
+import time
 from io import TextIOWrapper
 
 import click
 
+import duplicates
 import utils
-from constants import CLIENT_ID
+from constants import CLIENT_ID, JOURNAL_FOLDER, LIKES_PLAYLIST
 from spotify_api import SpotifyAPI
 
 utils.setup_logging()
 
+SCOPE = "user-library-read playlist-read-private playlist-read-collaborative"
+# Failed checks in a row before the daemon logs in again
+MAX_FAILED_CHECKS = 3
+
+# What backup_playlist did with a playlist
+WRITTEN = "written"
+FINISHED = "finished"
+DECLINED = "declined"
+
 
 def write_playlist(f: TextIOWrapper, playlist):
     """Write playlist to a file"""
@@ -28,19 +41,31 @@ def write_playlist(f: TextIOWrapper, playlist):
 def write_duplicates(f: TextIOWrapper, playlist):
     """Write duplicates to a file"""
     f.write(playlist["name"] + " duplicates\n")
-    for i, track1 in enumerate(playlist["tracks"]):
-        if track1["track"] is None:
-            continue
-        for j, track2 in enumerate(playlist["tracks"]):
-            if track2["track"] is None:
-                continue
-            if (
-                i < j
-                and track1["track"]["name"][:5] == track2["track"]["name"][:5]
-                and track1["track"]["artists"] == track2["track"]["artists"]
-            ):
-                write_track(f, track1, i + 1)
-                write_track(f, track2, j + 1)
+    for group in duplicates.find_duplicates(playlist["tracks"]):
+        for i in group:
+            write_track(f, playlist["tracks"][i], i + 1)
+        f.write("\n")
+
+
+def write_library_duplicates(f: TextIOWrapper, playlists):
+    """Write duplicates across all playlists to a file"""
+    f.write("Library duplicates\n")
+
+    # The same track in several playlists is overlap, not a duplicate, so compare each URI once
+    occurrences = {}
+    for p in playlists:
+        for i, t in enumerate(p["tracks"]):
+            if t["track"] is not None:
+                occurrences.setdefault(t["track"]["uri"], []).append((p, i, t))
+    uris = list(occurrences.keys())
+
+    tracks = [occurrences[uri][0][2] for uri in uris]
+    for group in duplicates.find_duplicates(tracks):
+        for k in group:
+            for playlist, i, track in occurrences[uris[k]]:
+                f.write(playlist["name"] + "\t")
+                write_track(f, track, i + 1)
+        f.write("\n")
 
 
 def write_track(f: TextIOWrapper, track, index):
@@ -60,6 +85,57 @@ def playlist_filename(playlist):
     return "".join([x if x.isalnum() else "_" for x in playlist["name"]])
 
 
+def playlist_snapshot(spotify: SpotifyAPI, me, playlist):
+    """A value that changes whenever the playlist's tracks change, its snapshot_id"""
+    if not playlist.get("snapshot_id"):
+        # Likes have no snapshot_id, so fingerprint the count and the most recent like
+        response = spotify.get(
+            "users/{user_id}/tracks".format(user_id=me["id"]), {"limit": 1}
+        )
+        playlist["snapshot_id"] = "_".join(
+            [str(response["total"])] + [t["added_at"] for t in response["items"]]
+        )
+    return playlist["snapshot_id"]
+
+
+def journal_filename(folder: str, playlist):
+    """Journal of the pages loaded so far, named by snapshot so changed playlists start over"""
+    name = playlist["id"] + "_"
+    name += "".join([x if x.isalnum() else "_" for x in playlist["snapshot_id"]])
+    return os.path.join(folder, JOURNAL_FOLDER, name + ".jsonl")
+
+
+def snapshot_filename(filename: str):
+    """Records the snapshot_id that a finished file was written from"""
+    folder, name = os.path.split(filename)
+    return os.path.join(folder, JOURNAL_FOLDER, name + ".snapshot")
+
+
+def is_finished(filename: str, playlist):
+    """Whether the file was completely written from the playlist's current snapshot"""
+    if not os.path.exists(filename):
+        return False
+    try:
+        with open(snapshot_filename(filename), encoding="utf-8") as f:
+            return f.read() == playlist["snapshot_id"]
+    except FileNotFoundError:
+        return False
+
+
+def load_playlist(spotify: SpotifyAPI, me, playlist, folder: str, resume: bool):
+    """Load a playlist, checkpointing to its journal, and continuing from it if resuming"""
+    playlist_snapshot(spotify, me, playlist)
+    journal = journal_filename(folder, playlist)
+    for old in glob.glob(
+        os.path.join(folder, JOURNAL_FOLDER, glob.escape(playlist["id"]) + "*.jsonl")
+    ):
+        if old != journal or not resume:
+            os.remove(old)
+
+    utils.load_playlist(spotify, me, playlist, journal)
+    return journal
+
+
 def confirm_overwrite(filename: str, yes: bool = False):
     return (
         yes
@@ -68,6 +144,61 @@ def confirm_overwrite(filename: str, yes: bool = False):
     )
 
 
+def backup_playlist(
+    spotify: SpotifyAPI,
+    me,
+    playlist,
+    folder: str,
+    format: str,
+    resume: bool = False,
+    yes: bool = False,
+    check_duplicates: bool = False,
+) -> str:
+    """Load a playlist and write it to its own file
+
+    Returns WRITTEN, FINISHED if resuming skipped a file that is already current,
+    or DECLINED if the file wasn't overwritten.
+    """
+    filename = os.path.join(folder, playlist_filename(playlist) + "." + format)
+
+    playlist_snapshot(spotify, me, playlist)
+    if resume and is_finished(filename, playlist):
+        logging.info("Skipping finished file: " + filename)
+        return FINISHED
+
+    if not confirm_overwrite(filename, yes):
+        return DECLINED
+
+    journal = load_playlist(spotify, me, playlist, folder, resume)
+
+    with open(filename + ".tmp", "w", encoding="utf-8") as f:
+        logging.info("Writing file: " + filename)
+
+        if format == "json":
+            json.dump(playlist, f)
+        elif format == "txt":
+            write_playlist(f, playlist)
+
+    os.replace(filename + ".tmp", filename)
+    os.remove(journal)
+
+    with open(snapshot_filename(filename), "w", encoding="utf-8") as f:
+        f.write(playlist["snapshot_id"])
+
+    if check_duplicates:
+        duplicates_filename = os.path.join(
+            folder, playlist_filename(playlist) + "_duplicates.txt"
+        )
+
+        if confirm_overwrite(duplicates_filename, yes):
+            with open(duplicates_filename, "w", encoding="utf-8") as f:
+                logging.info("Writing file: " + f.name)
+
+                write_duplicates(f, playlist)
+
+    return WRITTEN
+
+
 def parse_args():
     parser = argparse.ArgumentParser(description="Exports your Spotify playlists.")
     parser.add_argument(
@@ -79,7 +210,7 @@ def parse_args():
     parser.add_argument(
         "--folder",
         default="backup",
-        help="folder to save each file, normal mode only (default: backup)",
+        help="folder to save each file, normal mode only, and load journals (default: backup)",
     )
     parser.add_argument(
         "--format",
@@ -106,6 +237,31 @@ def parse_args():
         action="store_true",
         help="check for duplicates, normal mode only (default: False)",
     )
+    parser.add_argument(
+        "--ld",
+        "--library-duplicates",
+        dest="libraryDuplicates",
+        action="store_true",
+        help="check for duplicates across all chosen playlists (default: False)",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="continue interrupted loads and skip playlist files finished from the current snapshot (default: False)",
+    )
+    parser.add_argument(
+        "--daemon",
+        dest="daemon",
+        action="store_true",
+        help="keep running, and back up playlists again when they change, normal mode only (default: False)",
+    )
+    parser.add_argument(
+        "--interval",
+        type=int,
+        default=300,
+        help="seconds between checks for changes in daemon mode (default: 300)",
+    )
     parser.add_argument(
         "-y",
         "--yes",
@@ -113,25 +269,37 @@ def parse_args():
         action="store_true",
         help="say yes to all overwrite confirmations (default: False)",
     )
-    parser.set_defaults(single=False, mine=False, checkDuplicates=False, yes=False)
+    parser.set_defaults(
+        single=False,
+        mine=False,
+        checkDuplicates=False,
+        libraryDuplicates=False,
+        resume=False,
+        daemon=False,
+        yes=False,
+    )
     parser.add_argument("file", help="output filename for single file mode", nargs="?")
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.daemon and args.single:
+        parser.error("--daemon can't be used with --single")
+    return args
 
 
 def main():
     args = parse_args()
 
     # Log into the Spotify API.
-    spotify = SpotifyAPI.authorize(
-        client_id=CLIENT_ID,
-        scope="user-library-read playlist-read-private playlist-read-collaborative",
-    )
+    spotify = SpotifyAPI.authorize(client_id=CLIENT_ID, scope=SCOPE)
 
     me = utils.login(spotify)
 
-    playlists = utils.get_playlists(spotify, me, args.include, args.mine)
+    all_playlists = utils.get_playlists(spotify, me, args.include, args.mine)
+
+    playlists = utils.choose_playlists(all_playlists)
 
-    playlists = utils.choose_playlists(playlists)
+    # Taken before the first backup, so changes made during it are picked up later
+    if args.daemon:
+        snapshots = {p["id"]: playlist_snapshot(spotify, me, p) for p in playlists}
 
     if args.single:
         if args.file and not confirm_overwrite(args.file, args.yes):
@@ -145,11 +313,13 @@ def main():
             if args.file and not confirm_overwrite(args.file, args.yes):
                 args.file = None
 
-        for playlist in playlists:
-            utils.load_playlist(spotify, me, playlist)
+        journals = [
+            load_playlist(spotify, me, playlist, args.folder, args.resume)
+            for playlist in playlists
+        ]
 
-        with open(args.file, "w", encoding="utf-8") as f:
-            logging.info("Writing file: " + f.name)
+        with open(args.file + ".tmp", "w", encoding="utf-8") as f:
+            logging.info("Writing file: " + args.file)
 
             if args.format == "json":
                 json.dump(playlists, f)
@@ -159,39 +329,123 @@ def main():
                     write_playlist(f, playlist)
 
                     f.write("\n")
+
+        # Only replace the file once it's complete, then the journals aren't needed
+        os.replace(args.file + ".tmp", args.file)
+        for journal in journals:
+            os.remove(journal)
     else:
         os.makedirs(args.folder, exist_ok=True)
 
+        statuses = {}
         for playlist in playlists:
-            filename = os.path.join(
-                args.folder, playlist_filename(playlist) + "." + args.format
+            statuses[playlist["id"]] = backup_playlist(
+                spotify,
+                me,
+                playlist,
+                args.folder,
+                args.format,
+                resume=args.resume,
+                yes=args.yes,
+                check_duplicates=args.checkDuplicates,
             )
 
-            if not confirm_overwrite(filename, args.yes):
-                continue
+        # Playlists that weren't written still count towards the library
+        if args.libraryDuplicates:
+            for playlist in playlists:
+                if statuses[playlist["id"]] != WRITTEN:
+                    utils.load_playlist(spotify, me, playlist)
 
-            utils.load_playlist(spotify, me, playlist)
+    if args.libraryDuplicates:
+        os.makedirs(args.folder, exist_ok=True)
+        duplicates_filename = os.path.join(args.folder, "library_duplicates.txt")
 
-            with open(filename, "w", encoding="utf-8") as f:
+        if confirm_overwrite(duplicates_filename, args.yes):
+            with open(duplicates_filename, "w", encoding="utf-8") as f:
                 logging.info("Writing file: " + f.name)
 
-                if args.format == "json":
-                    json.dump(playlist, f)
-                elif args.format == "txt":
-                    write_playlist(f, playlist)
+                write_library_duplicates(f, playlists)
 
-            if args.checkDuplicates:
-                duplicates_filename = os.path.join(
-                    args.folder, playlist_filename(playlist) + "_duplicates.txt"
-                )
+    if args.daemon:
+        # The user said no to overwriting declined playlists, so the daemon leaves them alone
+        declined = {id for id, status in statuses.items() if status == DECLINED}
+        snapshots = {id: s for id, s in snapshots.items() if id not in declined}
+        # Choosing all playlists means new ones are backed up too
+        chosen = None
+        if len(playlists) < len(all_playlists):
+            chosen = {p["id"] for p in playlists}
+        run_daemon(spotify, me, snapshots, chosen, declined, args)
 
-                if not confirm_overwrite(duplicates_filename, args.yes):
-                    continue
 
-                with open(duplicates_filename, "w", encoding="utf-8") as f:
-                    logging.info("Writing file: " + f.name)
+def check_for_changes(
+    spotify: SpotifyAPI, me, snapshots: dict, chosen: set, declined: set, args
+):
+    """List the playlists once, and back up those whose snapshot changed"""
+    playlists = utils.get_playlists(spotify, me, args.include, args.mine)
+    if chosen is not None:
+        playlists = [p for p in playlists if p["id"] in chosen]
+    playlists = [p for p in playlists if p["id"] not in declined]
+
+    changed = 0
+    for playlist in playlists:
+        snapshot = playlist_snapshot(spotify, me, playlist)
+        if snapshots.get(playlist["id"]) == snapshot:
+            continue
 
-                    write_duplicates(f, playlist)
+        if (
+            backup_playlist(
+                spotify,
+                me,
+                playlist,
+                args.folder,
+                args.format,
+                yes=True,
+                check_duplicates=args.checkDuplicates,
+            )
+            == WRITTEN
+        ):
+            snapshots[playlist["id"]] = snapshot
+            changed += 1
+
+    # Forget playlists that were deleted or unfollowed
+    ids = {p["id"] for p in playlists}
+    for id in [id for id in snapshots if id not in ids]:
+        del snapshots[id]
+
+    logging.info(f"Backed up {changed} changed playlists")
+
+
+def run_daemon(
+    spotify: SpotifyAPI, me, snapshots: dict, chosen: set, declined: set, args
+):
+    """Poll the playlists listing forever, backing up playlists whose snapshot changed
+
+    After MAX_FAILED_CHECKS failed checks in a row, it logs in again, since access
+    tokens expire after an hour. If checks still fail after that, it exits, so a
+    supervisor can restart it.
+    """
+    failures = 0
+    try:
+        while True:
+            logging.info(f"Checking for changes in {args.interval}s")
+            time.sleep(args.interval)
+
+            # SpotifyAPI exits when a request keeps failing, retry at the next interval
+            try:
+                check_for_changes(spotify, me, snapshots, chosen, declined, args)
+                failures = 0
+            except (Exception, SystemExit) as err:
+                failures += 1
+                logging.error(f"Failed to check for changes ({err!r})")
+
+                if failures > MAX_FAILED_CHECKS:
+                    logging.error("Still failing after logging in again, stopping")
+                    sys.exit(1)
+                if failures == MAX_FAILED_CHECKS:
+                    logging.info("Logging in again...")
+                    spotify = SpotifyAPI.authorize(client_id=CLIENT_ID, scope=SCOPE)
+    except KeyboardInterrupt:
+        logging.info("Stopped")
 
 
 if __name__ == "__main__":
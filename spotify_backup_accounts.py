@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import utils
+from spotify_api import SpotifyAPI
+from spotify_backup import WRITTEN, backup_playlist
+
+utils.setup_logging()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Exports the Spotify playlists of several accounts, without prompts."
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="number of accounts to back up at once (default: 4)",
+    )
+    parser.add_argument(
+        "--summary",
+        default="backup_summary.json",
+        help="output filename for the per-account summary (default: backup_summary.json)",
+    )
+    parser.add_argument("config", help="JSON file listing the accounts to back up")
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    with open(args.config, encoding="utf-8") as f:
+        accounts = json.load(f)["accounts"]
+
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        summary = list(executor.map(backup_account, accounts))
+
+    with open(args.summary, "w", encoding="utf-8") as f:
+        logging.info("Writing file: " + f.name)
+        json.dump(summary, f, indent=2)
+
+    for result in summary:
+        log = logging.error if result["error"] or result["failed"] else logging.info
+        log(
+            f"{result['name']}: {result['saved']} saved, {result['skipped']} skipped, "
+            f"{len(result['failed'])} failed in {result['duration']:.0f}s"
+            + (f" ({result['error']})" if result["error"] else "")
+        )
+
+
+def choose_playlists(playlists: list, selectors: list) -> list:
+    """Pick the playlists matching any selector, by name or ID, or all without selectors"""
+    if not selectors:
+        return playlists
+    return [p for p in playlists if p["name"] in selectors or p["id"] in selectors]
+
+
+def backup_account(account: dict) -> dict:
+    """Back up the playlists of one account, returning its summary"""
+    result = {
+        "name": account["name"],
+        "duration": 0,
+        "saved": 0,
+        "skipped": 0,
+        "failed": [],
+        "error": None,
+    }
+    start = time.time()
+
+    # SpotifyAPI exits when a request keeps failing, only give up on this account
+    try:
+        spotify = SpotifyAPI(account["token"], account.get("requests_per_second", 5))
+        me = utils.login(spotify)
+
+        playlists = utils.get_playlists(
+            spotify,
+            me,
+            account.get("include", "likes,playlists"),
+            account.get("mine", False),
+        )
+        playlists = choose_playlists(playlists, account.get("playlists", []))
+
+        folder = account.get("folder", os.path.join("backup", account["name"]))
+        os.makedirs(folder, exist_ok=True)
+
+        for playlist in playlists:
+            try:
+                status = backup_playlist(
+                    spotify,
+                    me,
+                    playlist,
+                    folder,
+                    account.get("format", "json"),
+                    resume=account.get("resume", False),
+                    yes=True,
+                )
+            except (Exception, SystemExit) as err:
+                logging.error(f"{account['name']}: failed {playlist['name']} ({err!r})")
+                result["failed"].append(
+                    {"playlist": playlist["name"], "error": repr(err)}
+                )
+                continue
+            result["saved" if status == WRITTEN else "skipped"] += 1
+    except (Exception, SystemExit) as err:
+        logging.error(f"{account['name']}: failed ({err!r})")
+        result["error"] = repr(err)
+
+    result["duration"] = time.time() - start
+    return result
+
+
+if __name__ == "__main__":
+    main()
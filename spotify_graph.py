@@ -2,13 +2,15 @@
 
 import argparse
 import logging
+from collections import Counter
 from datetime import datetime
 from spotify_backup import confirm_overwrite
 
 import matplotlib.pyplot as plt
 
+import metadata
 import utils
-from constants import CLIENT_ID
+from constants import CLIENT_ID, ENERGY_BAND, TEMPO_BAND
 from spotify_api import SpotifyAPI
 
 utils.setup_logging()
@@ -16,6 +18,7 @@ utils.setup_logging()
 GRAPH_COMPILATIONS_INCLUDE = "include"
 GRAPH_COMPILATIONS_EXCLUDE = "exclude"
 GRAPH_COMPILATIONS_BOTH = "both"
+GRAPH_TOP_GENRES = 20
 
 
 def parse_args():
@@ -87,7 +90,21 @@ def main():
             "tracks": [t for p in playlists for t in p["tracks"]],
         }
 
-    for plot in [plot_release_date, plot_date_added, plot_release_vs_added]:
+    plots = [plot_release_date, plot_date_added, plot_release_vs_added]
+
+    # SpotifyAPI exits when a request keeps failing, only skip the plots needing that data
+    try:
+        metadata.load_audio_features(spotify, playlist["tracks"])
+        plots += [plot_tempo, plot_energy]
+    except (Exception, SystemExit) as err:
+        logging.warning(f"Couldn't load audio features, skipping their plots ({err!r})")
+    try:
+        metadata.load_genres(spotify, playlist["tracks"])
+        plots += [plot_genres]
+    except (Exception, SystemExit) as err:
+        logging.warning(f"Couldn't load genres, skipping their plot ({err!r})")
+
+    for plot in plots:
         plt.figure()
         if args.compilations in [GRAPH_COMPILATIONS_BOTH, GRAPH_COMPILATIONS_INCLUDE]:
             plot(playlist, excludeCompilations=False)
@@ -197,6 +214,72 @@ def plot_release_vs_added(playlist, excludeCompilations: bool):
     plt.ylabel("Release Date")
 
 
+def plot_tempo(playlist, excludeCompilations: bool):
+    tracks = exclude_compilations(playlist["tracks"], excludeCompilations)
+
+    tempos = [
+        t["audio_features"]["tempo"]
+        for t in tracks
+        if t.get("audio_features") is not None
+    ]
+
+    plt.hist(
+        tempos,
+        bins=range(
+            0, utils.tempo_to_band(max(tempos, default=0)) + 2 * TEMPO_BAND, TEMPO_BAND
+        ),
+        alpha=0.7,
+        label=f"{'Exc.' if excludeCompilations else 'Inc.'} Compilations",
+    )
+
+    plt.title(playlist["name"])
+    plt.xlabel("Tempo (BPM)")
+    plt.ylabel("Count")
+    plt.legend()
+
+
+def plot_energy(playlist, excludeCompilations: bool):
+    tracks = exclude_compilations(playlist["tracks"], excludeCompilations)
+
+    energies = [
+        t["audio_features"]["energy"]
+        for t in tracks
+        if t.get("audio_features") is not None
+    ]
+
+    plt.hist(
+        energies,
+        bins=[b / 100 for b in range(0, 100 + ENERGY_BAND, ENERGY_BAND)],
+        alpha=0.7,
+        label=f"{'Exc.' if excludeCompilations else 'Inc.'} Compilations",
+    )
+
+    plt.title(playlist["name"])
+    plt.xlabel("Energy")
+    plt.ylabel("Count")
+    plt.legend()
+
+
+def plot_genres(playlist, excludeCompilations: bool):
+    tracks = exclude_compilations(playlist["tracks"], excludeCompilations)
+
+    genres = Counter(g for t in tracks for g in t.get("genres", []))
+    top = genres.most_common(GRAPH_TOP_GENRES)[::-1]  # barh plots bottom up
+
+    plt.barh(
+        [g for g, _ in top],
+        [c for _, c in top],
+        alpha=0.7,
+        label=f"{'Exc.' if excludeCompilations else 'Inc.'} Compilations",
+    )
+
+    plt.title(playlist["name"])
+    plt.xlabel("Count")
+    plt.ylabel("Genre")
+    plt.legend()
+    plt.tight_layout()
+
+
 def exclude_compilations(tracks: list, excludeCompilations: bool):
     return [
         t
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import argparse
+import csv
+import logging
+
+import matplotlib.pyplot as plt
+import numpy as np
+
+import utils
+from constants import CLIENT_ID
+from spotify_api import SpotifyAPI
+from spotify_backup import confirm_overwrite
+
+utils.setup_logging()
+
+# Number of track columns multiplied at once, keeps the float32 chunk small
+# (500 playlists x 8192 tracks = 16MB) while letting BLAS do the heavy lifting.
+OVERLAP_CHUNK = 8192
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Finds which of your Spotify playlists overlap."
+    )
+    parser.add_argument(
+        "--include",
+        default="likes,playlists",
+        choices=["likes,playlists", "playlists,likes", "playlists", "likes"],
+        help="include playlists or likes, or both (default: playlists)",
+    )
+    parser.add_argument(
+        "--mine",
+        dest="mine",
+        action="store_true",
+        help="compare only playlists owned by you (default: False)",
+    )
+    parser.add_argument(
+        "--top",
+        type=int,
+        default=20,
+        help="number of most overlapping pairs to report (default: 20)",
+    )
+    parser.add_argument(
+        "--file",
+        default="overlap.csv",
+        help="output filename for the jaccard matrix (default: overlap.csv)",
+    )
+    parser.add_argument(
+        "--heatmap",
+        dest="heatmap",
+        action="store_true",
+        help="show a heatmap of the jaccard matrix (default: False)",
+    )
+    parser.add_argument(
+        "--save",
+        dest="save",
+        action="store_true",
+        help="save the heatmap as an image (default: False)",
+    )
+    parser.add_argument(
+        "-y",
+        "--yes",
+        dest="yes",
+        action="store_true",
+        help="say yes to all overwrite confirmations (default: False)",
+    )
+    parser.set_defaults(mine=False, heatmap=False, save=False, yes=False)
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    # Log into the Spotify API.
+    spotify = SpotifyAPI.authorize(
+        client_id=CLIENT_ID,
+        scope="user-library-read playlist-read-private playlist-read-collaborative",
+    )
+
+    me = utils.login(spotify)
+
+    playlists = utils.get_playlists(spotify, me, args.include, args.mine)
+
+    playlists = utils.choose_playlists(playlists)
+
+    for playlist in playlists:
+        utils.load_playlist(spotify, me, playlist)
+
+    membership = track_membership(playlists)
+    sizes, intersections = overlap_counts(membership)
+    jaccard = jaccard_matrix(sizes, intersections)
+    logging.info(
+        f"Compared {len(playlists)} playlists ({membership.shape[1]} distinct tracks)"
+    )
+
+    if confirm_overwrite(args.file, args.yes):
+        with open(args.file, "w", encoding="utf-8", newline="") as f:
+            logging.info("Writing file: " + f.name)
+            write_matrix(f, playlists, jaccard)
+
+    for i, j in top_pairs(jaccard, args.top):
+        print(
+            "{jaccard:.3f}\t{shared}\t{a} ({a_size})\t{b} ({b_size})".format(
+                jaccard=jaccard[i, j],
+                shared=intersections[i, j],
+                a=playlists[i]["name"],
+                a_size=sizes[i],
+                b=playlists[j]["name"],
+                b_size=sizes[j],
+            )
+        )
+
+    if args.heatmap or args.save:
+        plt.figure()
+        plot_heatmap(playlists, jaccard)
+
+        filename = "overlap_heatmap.png"
+        if args.save and confirm_overwrite(filename, args.yes):
+            plt.savefig(filename)
+            logging.info(f"Saved {filename}")
+
+        if not args.save:
+            plt.show()
+
+
+def track_membership(playlists: list) -> np.ndarray:
+    """Map every track URI to a dense ID, and each playlist to a bitset row"""
+    ids = {}
+    rows = []
+    for playlist in playlists:
+        rows.append(
+            [
+                ids.setdefault(t["track"]["uri"], len(ids))
+                for t in playlist["tracks"]
+                if t["track"] is not None
+            ]
+        )
+
+    membership = np.zeros((len(playlists), len(ids)), dtype=bool)
+    for i, row in enumerate(rows):
+        membership[i, row] = True
+    return membership
+
+
+def overlap_counts(membership: np.ndarray):
+    """Count tracks per playlist and tracks shared by every pair of playlists"""
+    sizes = membership.sum(axis=1)
+    intersections = np.zeros((len(membership), len(membership)), dtype=np.int64)
+    for start in range(0, membership.shape[1], OVERLAP_CHUNK):
+        chunk = membership[:, start : start + OVERLAP_CHUNK].astype(np.float32)
+        intersections += np.rint(chunk @ chunk.T).astype(np.int64)
+    return sizes, intersections
+
+
+def jaccard_matrix(sizes: np.ndarray, intersections: np.ndarray) -> np.ndarray:
+    unions = sizes[:, None] + sizes[None, :] - intersections
+    return np.divide(
+        intersections,
+        unions,
+        out=np.zeros(intersections.shape, dtype=float),
+        where=unions > 0,
+    )
+
+
+def top_pairs(jaccard: np.ndarray, n: int) -> list:
+    """Return the (i, j) pairs with the highest jaccard similarity, i < j"""
+    i, j = np.triu_indices(len(jaccard), k=1)
+    scores = jaccard[i, j]
+    n = min(n, len(scores))
+    if n <= 0:
+        return []
+    best = np.argpartition(-scores, n - 1)[:n]
+    best = best[np.argsort(-scores[best], kind="stable")]
+    return [(i[k], j[k]) for k in best if scores[k] > 0]
+
+
+def write_matrix(f, playlists: list, jaccard: np.ndarray):
+    """Write the jaccard matrix as CSV with playlist names as headers"""
+    writer = csv.writer(f)
+    names = [p["name"] for p in playlists]
+    writer.writerow([""] + names)
+    for name, row in zip(names, jaccard):
+        writer.writerow([name] + [f"{x:.4f}" for x in row])
+
+
+def plot_heatmap(playlists: list, jaccard: np.ndarray):
+    plt.imshow(jaccard, cmap="viridis", vmin=0, vmax=1)
+    plt.colorbar(label="Jaccard")
+
+    # Labels become unreadable with hundreds of playlists
+    if len(playlists) <= 50:
+        names = [p["name"] for p in playlists]
+        plt.xticks(range(len(names)), names, rotation=90)
+        plt.yticks(range(len(names)), names)
+
+    plt.title("Playlist Overlap")
+    plt.tight_layout()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import utils
+from constants import CLIENT_ID, CREATED_DESCRIPTION
+from spotify_api import SpotifyAPI
+
+utils.setup_logging()
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Recreates your Spotify playlists from a backup."
+    )
+    parser.add_argument(
+        "--progress",
+        default="restore_progress.json",
+        help="file recording restored playlists, to resume an interrupted restore (default: restore_progress.json)",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=4,
+        help="number of playlists to restore at once (default: 4)",
+    )
+    parser.add_argument(
+        "backup", help="backup file or folder written by spotify_backup.py"
+    )
+    return parser.parse_args()
+
+
+def main():
+    args = parse_args()
+
+    playlists = read_backup(args.backup)
+    logging.info(f"Found {len(playlists)} playlists in {args.backup}")
+
+    playlists = utils.choose_playlists(playlists)
+
+    # Log into the Spotify API.
+    spotify = SpotifyAPI.authorize(
+        client_id=CLIENT_ID,
+        # Restored playlists are private, so reading them back to resume needs playlist-read-private
+        scope="playlist-read-private playlist-modify-private",
+    )
+
+    me = utils.login(spotify)
+
+    progress = RestoreProgress(args.progress)
+
+    # Playlists from an interrupted restore, to continue them, or create them again if deleted
+    existing = {}
+    if any(not entry["done"] for entry in progress.values()):
+        existing = {
+            p["id"]: p for p in utils.get_playlists(spotify, me, "playlists", mine=True)
+        }
+        adopt_orphans(progress, existing)
+
+    failed = 0
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {
+            executor.submit(
+                restore_playlist, spotify, me, playlist, progress, existing
+            ): playlist
+            for playlist in playlists
+        }
+        for future in as_completed(futures):
+            try:
+                future.result()
+            # SpotifyAPI exits when a request keeps failing, only give up on this playlist
+            except (Exception, SystemExit) as err:
+                logging.error(f"Failed to restore {futures[future]['name']} ({err})")
+                failed += 1
+
+    if failed:
+        logging.error(f"Failed to restore {failed} playlists, run again to resume")
+
+
+def read_backup(path: str) -> list:
+    """Read the playlists from a backup file, or all backup files in a folder"""
+    if os.path.isdir(path):
+        return [
+            playlist
+            for filename in sorted(os.listdir(path))
+            if filename.endswith((".json", ".txt"))
+            and not filename.endswith("duplicates.txt")
+            for playlist in read_backup(os.path.join(path, filename))
+        ]
+
+    with open(path, encoding="utf-8") as f:
+        if path.endswith(".json"):
+            playlists = json.load(f)
+            # A file per playlist holds one playlist, a single file holds a list
+            if isinstance(playlists, dict):
+                playlists = [playlists]
+        else:
+            playlists = read_txt(f)
+
+    for i, playlist in enumerate(playlists):
+        playlist["key"] = f"{os.path.abspath(path)}#{i}"
+    return playlists
+
+
+def read_txt(f) -> list:
+    """Read playlists from a txt backup, as written by spotify_backup.write_playlist"""
+    playlists = []
+    playlist = None
+    for line in f:
+        line = line.rstrip("\n")
+        if not line:
+            playlist = None
+        elif playlist is None:
+            playlist = {"name": line, "tracks": []}
+            playlists.append(playlist)
+        else:
+            playlist["tracks"].append({"track": {"uri": line.split("\t")[-1]}})
+    return playlists
+
+
+def restorable_tracks(playlist) -> list:
+    # Local files can't be added through the API
+    return [
+        t
+        for t in playlist["tracks"]
+        if t["track"] is not None and not t["track"]["uri"].startswith("spotify:local:")
+    ]
+
+
+def adopt_orphans(progress: "RestoreProgress", existing: dict):
+    """Find playlists created just before an interruption, before their ID was saved"""
+    claimed = {entry["id"] for entry in progress.values()}
+    for key, entry in progress.items():
+        if entry["id"] is not None:
+            continue
+        for p in existing.values():
+            if (
+                p["id"] not in claimed
+                and p["name"] == entry["name"]
+                and (p["description"] or "").startswith(CREATED_DESCRIPTION)
+            ):
+                progress.set(key, dict(entry, id=p["id"]))
+                claimed.add(p["id"])
+                break
+
+
+def restore_playlist(
+    spotify: SpotifyAPI, me, playlist, progress: "RestoreProgress", existing: dict
+):
+    restored = progress.get(playlist["key"])
+    if restored and restored["done"]:
+        logging.info(f"Skipping restored playlist: {playlist['name']}")
+        return
+
+    tracks = restorable_tracks(playlist)
+    if len(tracks) < len(playlist["tracks"]):
+        logging.warning(
+            f"Skipping {len(playlist['tracks']) - len(tracks)} local or unavailable tracks in {playlist['name']}"
+        )
+
+    new_playlist = None
+    if restored and restored["id"] in existing:
+        # The playlist only has tracks we added, in order, so continue after them
+        new_playlist = existing[restored["id"]]
+        start = new_playlist["tracks"]["total"]
+        logging.info(
+            f"Resuming playlist: {playlist['name']} ({start}/{len(tracks)} songs)"
+        )
+    elif restored and restored["id"]:
+        logging.warning(f"Restored playlist was deleted: {playlist['name']}")
+
+    if new_playlist is None:
+        # Saved first, so an interruption while creating it can be found again by name
+        progress.set(
+            playlist["key"], {"id": None, "name": playlist["name"], "done": False}
+        )
+        new_playlist = utils.create_playlist(spotify, me, playlist["name"])
+        progress.set(
+            playlist["key"],
+            {"id": new_playlist["id"], "name": playlist["name"], "done": False},
+        )
+        start = 0
+
+    utils.add_tracks(spotify, new_playlist, tracks, start)
+    progress.set(
+        playlist["key"],
+        {"id": new_playlist["id"], "name": playlist["name"], "done": True},
+    )
+    logging.info(f"Restored playlist: {playlist['name']} ({len(tracks)} songs)")
+
+
+class RestoreProgress:
+    """The playlists created so far, saved after every change so a restore can resume"""
+
+    def __init__(self, filename: str):
+        self.filename = filename
+        self._lock = threading.Lock()
+        self._data = {}
+
+        if os.path.exists(filename):
+            with open(filename, encoding="utf-8") as f:
+                self._data = json.load(f)
+
+    def get(self, key):
+        with self._lock:
+            return self._data.get(key)
+
+    def items(self):
+        with self._lock:
+            return list(self._data.items())
+
+    def values(self):
+        with self._lock:
+            return list(self._data.values())
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            with open(self.filename + ".tmp", "w", encoding="utf-8") as f:
+                json.dump(self._data, f)
+            os.replace(self.filename + ".tmp", self.filename)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,10 @@
 #!/usr/bin/env python3
 
 import argparse
+from collections import Counter
 from datetime import datetime
 
+import metadata
 import utils
 from constants import ALBUM_TYPE_COMPILATIONS, CLIENT_ID
 from spotify_api import SpotifyAPI
@@ -11,6 +13,9 @@ utils.setup_logging()
 
 SPLIT_MODE_DATE_ADDED = "date-added"
 SPLIT_MODE_RELEASE_DATE = "release-date"
+SPLIT_MODE_TEMPO = "tempo"
+SPLIT_MODE_ENERGY = "energy"
+SPLIT_MODE_GENRE = "genre"
 
 
 def parse_args():
@@ -20,7 +25,13 @@ def parse_args():
     parser.add_argument(
         "--mode",
         default=SPLIT_MODE_RELEASE_DATE,
-        choices=[SPLIT_MODE_RELEASE_DATE, SPLIT_MODE_DATE_ADDED],
+        choices=[
+            SPLIT_MODE_RELEASE_DATE,
+            SPLIT_MODE_DATE_ADDED,
+            SPLIT_MODE_TEMPO,
+            SPLIT_MODE_ENERGY,
+            SPLIT_MODE_GENRE,
+        ],
         help=f"output format (default: {SPLIT_MODE_RELEASE_DATE})",
     )
     parser.add_argument(
@@ -62,6 +73,15 @@ def main():
         split_release_date(playlist, new_playlists, args.separateCompilations)
     elif args.mode == SPLIT_MODE_DATE_ADDED:
         split_date_added(playlist, new_playlists)
+    elif args.mode == SPLIT_MODE_TEMPO:
+        metadata.load_audio_features(spotify, playlist["tracks"])
+        split_tempo(playlist, new_playlists)
+    elif args.mode == SPLIT_MODE_ENERGY:
+        metadata.load_audio_features(spotify, playlist["tracks"])
+        split_energy(playlist, new_playlists)
+    elif args.mode == SPLIT_MODE_GENRE:
+        metadata.load_genres(spotify, playlist["tracks"])
+        split_genre(playlist, new_playlists)
 
     for playlist_name in sorted(new_playlists.keys()):
         utils.create_playlist(spotify, me, playlist_name, new_playlists[playlist_name])
@@ -104,5 +124,50 @@ def split_date_added(playlist, new_playlists: dict):
             new_playlists[name] = [t]
 
 
+def split_tempo(playlist, new_playlists: dict):
+
+    for t in playlist["tracks"]:
+        if t.get("audio_features") is None:
+            name = "tempo-unknown"
+        else:
+            name = f"{utils.tempo_to_band(t['audio_features']['tempo']):03d}bpm"
+        name = new_playlist_name(playlist, name)
+        if name in new_playlists:
+            new_playlists[name].append(t)
+        else:
+            new_playlists[name] = [t]
+
+
+def split_energy(playlist, new_playlists: dict):
+
+    for t in playlist["tracks"]:
+        if t.get("audio_features") is None:
+            name = "energy-unknown"
+        else:
+            name = f"energy{utils.energy_to_band(t['audio_features']['energy'])}"
+        name = new_playlist_name(playlist, name)
+        if name in new_playlists:
+            new_playlists[name].append(t)
+        else:
+            new_playlists[name] = [t]
+
+
+def split_genre(playlist, new_playlists: dict):
+
+    # Artists have many genres, so each track goes to its most common one in the playlist
+    counts = Counter(g for t in playlist["tracks"] for g in t.get("genres", []))
+
+    for t in playlist["tracks"]:
+        if not t.get("genres"):
+            name = "genre-unknown"
+        else:
+            name = max(t["genres"], key=lambda g: counts[g])
+        name = new_playlist_name(playlist, name)
+        if name in new_playlists:
+            new_playlists[name].append(t)
+        else:
+            new_playlists[name] = [t]
+
+
 if __name__ == "__main__":
     main()
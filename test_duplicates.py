@@ -0,0 +1,75 @@
+import pytest
+
+from duplicates import find_duplicates, normalize_title, numbers
+
+
+def track(name, artists, isrc=None):
+    t = {"name": name, "artists": [{"name": a} for a in artists], "uri": name}
+    if isrc:
+        t["external_ids"] = {"isrc": isrc}
+    return {"track": t}
+
+
+@pytest.mark.parametrize(
+    "name, expected",
+    [
+        ("Yesterday - Remastered 2009", "yesterday"),
+        ("Song (feat. Someone) [Live at Wembley]", "song"),
+        ("Café del Mar - 2011 Remaster", "cafe del mar"),
+        ("Something (Withering Heights)", "something withering heights"),
+        ("Run (Live Forever Mix)", "run live forever mix"),
+        ("Hold On - Edith Piaf Tribute", "hold on edith piaf tribute"),
+        ("Stay - With You", "stay with you"),
+        ("(Live)", "(live)"),
+        ("?", "?"),
+    ],
+)
+def test_normalize_title(name, expected):
+    assert normalize_title(name) == expected
+
+
+def test_find_duplicates():
+    tracks = [
+        track("Yesterday", ["The Beatles"]),
+        track("Yesterday - Remastered 2009", ["The Beatles"]),
+        track("Other", ["A", "B"]),
+        track("Other (feat. C)", ["B", "A"]),
+        track("Foo", ["Z"], "US1"),
+        track("Bar", ["Q"], "us1"),
+        {"track": None},
+        track("Intro", ["A"]),
+        track("Intro", ["B"]),
+    ]
+    assert find_duplicates(tracks) == [[0, 1], [2, 3], [4, 5]]
+
+
+@pytest.mark.parametrize(
+    "title, expected",
+    [
+        ("another brick in the wall pt 2", [2]),
+        ("symphony no 9 iv", [9, 4]),
+        ("part xix", [19]),
+        ("the mix", []),
+    ],
+)
+def test_numbers(title, expected):
+    assert numbers(title) == expected
+
+
+def test_find_duplicates_with_numbers():
+    tracks = [
+        track("Another Brick in the Wall, Pt. 1", ["Pink Floyd"]),
+        track("Another Brick in the Wall, Pt. 2", ["Pink Floyd"]),
+        track("Another Brick in the Wall, Part II", ["Pink Floyd"]),
+        track("Another Brick in the Wall, Pt. 2 - Remastered", ["Pink Floyd"]),
+    ]
+    assert find_duplicates(tracks) == [[1, 3]]
+
+
+@pytest.mark.parametrize(
+    "names",
+    [["Hello", "Bye", "(Live)"], ["?", "!"], ["", "Hello", ""]],
+)
+def test_find_duplicates_without_shingles(names):
+    tracks = [track(name, [str(i)]) for i, name in enumerate(names)]
+    assert find_duplicates(tracks) == []
@@ -2,7 +2,7 @@ import coloredlogs
 from datetime import datetime
 import logging
 
-from constants import LIKES_PLAYLIST
+from constants import CREATED_DESCRIPTION, ENERGY_BAND, LIKES_PLAYLIST, TEMPO_BAND
 from spotify_api import SpotifyAPI
 
 
@@ -51,11 +51,13 @@ def get_playlists(
     return playlists
 
 
-def load_playlist(spotify: SpotifyAPI, me, playlist):
+def load_playlist(spotify: SpotifyAPI, me, playlist, journal: str = None):
     if playlist["name"] == LIKES_PLAYLIST:
         # List all liked tracks
         playlist["tracks"] = spotify.list(
-            "users/{user_id}/tracks".format(user_id=me["id"]), {"limit": 50}
+            "users/{user_id}/tracks".format(user_id=me["id"]),
+            {"limit": 50},
+            journal=journal,
         )
         logging.info(f"Loaded {playlist['name']} ({len(playlist['tracks'])} songs)")
     else:
@@ -63,7 +65,9 @@ def load_playlist(spotify: SpotifyAPI, me, playlist):
         logging.info(
             f"Loading playlist: {playlist['name']} ({playlist['tracks']['total']} songs)"
         )
-        playlist["tracks"] = spotify.list(playlist["tracks"]["href"], {"limit": 100})
+        playlist["tracks"] = spotify.list(
+            playlist["tracks"]["href"], {"limit": 100}, journal=journal
+        )
 
 
 def list_playlists(playlists, all=True):
@@ -119,7 +123,7 @@ def create_playlist(spotify: SpotifyAPI, me, name: str, tracks: list = []):
         data={
             "name": name,
             "public": False,
-            "description": f"Created by SpotifyDataTools at {datetime.today()}",
+            "description": f"{CREATED_DESCRIPTION} at {datetime.today()}",
         },
     )
     logging.info(f"Created playlist: {name}")
@@ -131,9 +135,9 @@ def create_playlist(spotify: SpotifyAPI, me, name: str, tracks: list = []):
     return new_playlist
 
 
-def add_tracks(spotify: SpotifyAPI, playlist, tracks: list):
+def add_tracks(spotify: SpotifyAPI, playlist, tracks: list, start: int = 0):
     uris = [t["track"]["uri"] for t in tracks]
-    i = 0
+    i = start
     step = 100
     while i < len(uris):
         spotify.post(
@@ -157,3 +161,12 @@ def year_to_decade(year):
 
 def year_to_decade_str(year):
     return f"{year_to_decade(year):02d}s"
+
+
+def tempo_to_band(tempo):
+    return int(tempo // TEMPO_BAND * TEMPO_BAND)
+
+
+def energy_to_band(energy):
+    # Bands are in percent, and energy 1.0 belongs in the top band rather than its own
+    return min(int(energy * 100) // ENERGY_BAND * ENERGY_BAND, 100 - ENERGY_BAND)